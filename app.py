@@ -2,18 +2,80 @@
 Litchi Mission CSV Generator API
 A Flask API for generating Litchi-compatible mission CSV files
 """
-from flask import Flask, request, jsonify, make_response
+import gzip
+import hashlib
+from datetime import datetime, timezone
+
+import orjson
+from flask import Flask, Response, request, jsonify, make_response
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
-from litchi_csv_generator import generate_litchi_csv, validate_waypoint
+from werkzeug.exceptions import RequestEntityTooLarge
+from litchi_csv_generator import generate_litchi_csv, iter_litchi_csv, validate_waypoints
+
+# Compact, key-sorted JSON with a trailing newline, as jsonify produced before
+_ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider that serializes and parses with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=_ORJSON_OPTIONS),
+            mimetype='application/json'
+        )
+
+
+# Request bodies over this size are rejected with 413 before being read
+MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+
+# Largest mission accepted by /api/generate-mission
+MAX_WAYPOINTS = 100_000
 
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+app.config['COMPRESS_MIMETYPES'] = ['text/csv', 'application/json']
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_ALGORITHM_STREAMING'] = ['br', 'gzip']
+app.json = ORJSONProvider(app)
 CORS(app)
+Compress(app)
+
+
+def _json_body(payload):
+    """Serialize a constant payload once, matching jsonify's output"""
+    return orjson.dumps(payload, option=_ORJSON_OPTIONS)
+
+
+# The health payload is constant, so it is serialized and tagged once
+_HEALTH_BODY = _json_body({"status": "healthy", "message": "Litchi CSV Generator API is running"})
+_HEALTH_ETAG = hashlib.md5(_HEALTH_BODY).hexdigest()
+
+# Fixed validation errors, serialized once instead of on every failed request
+_ERR_NO_DATA = (_json_body({"error": "No data provided"}), 400)
+_ERR_NO_WAYPOINTS = (_json_body({"error": "No waypoints provided"}), 400)
+_ERR_TOO_MANY_WAYPOINTS = (_json_body({"error": "Too many waypoints"}), 413)
+_ERR_TOO_LARGE = (_json_body({"error": "Request body too large"}), 413)
 
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "message": "Litchi CSV Generator API is running"})
+    response = Response(_HEALTH_BODY, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    response.set_etag(_HEALTH_ETAG)
+    
+    return response.make_conditional(request)
 
 
 @app.route('/api/generate-mission', methods=['POST'])
@@ -41,102 +103,129 @@ def generate_mission():
     }
     """
     try:
-        data = request.get_json()
+        try:
+            data = orjson.loads(request.get_data())
+        except orjson.JSONDecodeError as e:
+            return jsonify({"error": f"Invalid JSON: {e}"}), 400
+        except RequestEntityTooLarge:
+            return Response(*_ERR_TOO_LARGE, mimetype='application/json')
         
         if not data:
-            return jsonify({"error": "No data provided"}), 400
+            return Response(*_ERR_NO_DATA, mimetype='application/json')
         
         mission_name = data.get('mission_name', 'mission')
         waypoints = data.get('waypoints', [])
         
         if not waypoints:
-            return jsonify({"error": "No waypoints provided"}), 400
-        
-        # Validate waypoints
-        for idx, waypoint in enumerate(waypoints):
-            is_valid, error_msg = validate_waypoint(waypoint)
-            if not is_valid:
-                return jsonify({"error": f"Waypoint {idx}: {error_msg}"}), 400
+            return Response(*_ERR_NO_WAYPOINTS, mimetype='application/json')
         
-        # Generate CSV
-        csv_content = generate_litchi_csv(waypoints)
+        if len(waypoints) > MAX_WAYPOINTS:
+            return Response(*_ERR_TOO_MANY_WAYPOINTS, mimetype='application/json')
         
-        # Create response with CSV file
-        response = make_response(csv_content)
-        response.headers['Content-Type'] = 'text/csv'
-        response.headers['Content-Disposition'] = f'attachment; filename={mission_name}.csv'
+        # Validate waypoints
+        is_valid, error_msg = validate_waypoints(waypoints)
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
         
-        return response
+        # Stream the CSV file as it is generated instead of buffering it
+        return Response(
+            iter_litchi_csv(waypoints),
+            content_type='text/csv',
+            headers={'Content-Disposition': f'attachment; filename={mission_name}.csv'}
+        )
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# Ilderton, Ontario coordinates: approximately 43.0347° N, 81.2453° W
+# Simple square pattern mission around Ilderton; a module-level tuple since
+# it is only read, and only once, to build the cached CSV below
+_ILDERTON_WAYPOINTS = (
+    {
+        "latitude": 43.0347,
+        "longitude": -81.2453,
+        "altitude": 50.0,
+        "heading": 0,
+        "curve_size": 0,
+        "rotation_direction": 0,
+        "gimbal_mode": 0,
+        "gimbal_pitch_angle": -90,
+        "action_type_1": -1,
+        "action_param_1": 0
+    },
+    {
+        "latitude": 43.0357,
+        "longitude": -81.2453,
+        "altitude": 50.0,
+        "heading": 90,
+        "curve_size": 0,
+        "rotation_direction": 0,
+        "gimbal_mode": 0,
+        "gimbal_pitch_angle": -90,
+        "action_type_1": -1,
+        "action_param_1": 0
+    },
+    {
+        "latitude": 43.0357,
+        "longitude": -81.2443,
+        "altitude": 50.0,
+        "heading": 180,
+        "curve_size": 0,
+        "rotation_direction": 0,
+        "gimbal_mode": 0,
+        "gimbal_pitch_angle": -90,
+        "action_type_1": -1,
+        "action_param_1": 0
+    },
+    {
+        "latitude": 43.0347,
+        "longitude": -81.2443,
+        "altitude": 50.0,
+        "heading": 270,
+        "curve_size": 0,
+        "rotation_direction": 0,
+        "gimbal_mode": 0,
+        "gimbal_pitch_angle": -90,
+        "action_type_1": -1,
+        "action_param_1": 0
+    }
+)
+
+# The example mission never changes, so its CSV is generated once at import
+_ILDERTON_CSV = generate_litchi_csv(_ILDERTON_WAYPOINTS)
+_ILDERTON_ETAG = hashlib.md5(_ILDERTON_CSV).hexdigest()
+
+# Gzip variant compressed once as well (mtime=0 keeps the bytes identical
+# across processes); Flask-Compress leaves responses already encoded alone
+_ILDERTON_CSV_GZ = gzip.compress(_ILDERTON_CSV, compresslevel=9, mtime=0)
+_ILDERTON_ETAG_GZ = f'{_ILDERTON_ETAG}:gzip'
+
+# Content is fixed for the life of the process, so it was last modified at
+# startup (HTTP dates have one-second resolution)
+_ILDERTON_LAST_MODIFIED = datetime.now(timezone.utc).replace(microsecond=0)
+
+
 @app.route('/api/example-mission/ilderton', methods=['GET'])
 def example_ilderton_mission():
     """
     Get an example mission for Ilderton, Ontario
     This creates a simple square pattern mission around Ilderton
     """
-    # Ilderton, Ontario coordinates: approximately 43.0347° N, 81.2453° W
-    waypoints = [
-        {
-            "latitude": 43.0347,
-            "longitude": -81.2453,
-            "altitude": 50.0,
-            "heading": 0,
-            "curve_size": 0,
-            "rotation_direction": 0,
-            "gimbal_mode": 0,
-            "gimbal_pitch_angle": -90,
-            "action_type_1": -1,
-            "action_param_1": 0
-        },
-        {
-            "latitude": 43.0357,
-            "longitude": -81.2453,
-            "altitude": 50.0,
-            "heading": 90,
-            "curve_size": 0,
-            "rotation_direction": 0,
-            "gimbal_mode": 0,
-            "gimbal_pitch_angle": -90,
-            "action_type_1": -1,
-            "action_param_1": 0
-        },
-        {
-            "latitude": 43.0357,
-            "longitude": -81.2443,
-            "altitude": 50.0,
-            "heading": 180,
-            "curve_size": 0,
-            "rotation_direction": 0,
-            "gimbal_mode": 0,
-            "gimbal_pitch_angle": -90,
-            "action_type_1": -1,
-            "action_param_1": 0
-        },
-        {
-            "latitude": 43.0347,
-            "longitude": -81.2443,
-            "altitude": 50.0,
-            "heading": 270,
-            "curve_size": 0,
-            "rotation_direction": 0,
-            "gimbal_mode": 0,
-            "gimbal_pitch_angle": -90,
-            "action_type_1": -1,
-            "action_param_1": 0
-        }
-    ]
-    
-    csv_content = generate_litchi_csv(waypoints)
+    if request.accept_encodings['gzip']:
+        response = make_response(_ILDERTON_CSV_GZ)
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(_ILDERTON_ETAG_GZ)
+    else:
+        response = make_response(_ILDERTON_CSV)
+        response.set_etag(_ILDERTON_ETAG)
     
-    response = make_response(csv_content)
     response.headers['Content-Type'] = 'text/csv'
     response.headers['Content-Disposition'] = 'attachment; filename=ilderton_mission.csv'
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    response.last_modified = _ILDERTON_LAST_MODIFIED
     
-    return response
+    return response.make_conditional(request)
 
 
 if __name__ == '__main__':
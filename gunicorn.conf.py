@@ -0,0 +1,19 @@
+"""
+Gunicorn configuration for serving the Litchi CSV Generator API
+Usage: gunicorn app:app
+"""
+import multiprocessing
+import os
+
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+
+# One process per core for CPU-bound JSON parsing and CSV generation,
+# with a few threads each to overlap network I/O
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = 4
+
+# Import the app once in the master so import-time work (compiled schema,
+# cached example CSV) is shared with the forked workers
+preload_app = True
@@ -3,7 +3,11 @@ Litchi CSV Generator Module
 Generates CSV files in Litchi mission format
 """
 import csv
-import io
+import operator
+from itertools import islice
+
+import fastjsonschema
+import numpy as np
 
 
 # Litchi CSV column headers based on Litchi mission format specification
@@ -56,6 +60,80 @@ LITCHI_HEADERS = [
     'photo_distinterval'
 ]
 
+# Header row, built and encoded once per process
+_HEADER_LINE_BYTES = (",".join(LITCHI_HEADERS) + "\r\n").encode('ascii')
+
+# Input keys for the 15 action type/parameter pairs, formatted once at import
+_ACTION_KEYS = [(f'action_type_{i}', f'action_param_{i}') for i in range(1, 16)]
+
+# Input waypoint key and default value for each column, in LITCHI_HEADERS order
+_FIELD_GETTERS = [
+    # Map input fields to Litchi CSV format
+    ('latitude', 0),
+    ('longitude', 0),
+    ('altitude', 50),
+    ('heading', 0),
+    ('curve_size', 0),
+    ('rotation_direction', 0),
+    ('gimbal_mode', 0),
+    ('gimbal_pitch_angle', -90)
+]
+
+# Action parameters (up to 15 actions)
+_FIELD_GETTERS += [
+    field
+    for type_key, param_key in _ACTION_KEYS
+    for field in ((type_key, -1), (param_key, 0))
+]
+
+# Optional parameters with defaults
+_FIELD_GETTERS += [
+    ('altitude_mode', 0),
+    ('speed', 0),
+    ('poi_latitude', 0),
+    ('poi_longitude', 0),
+    ('poi_altitude', 0),
+    ('poi_altitude_mode', 0),
+    ('photo_time_interval', -1),
+    ('photo_dist_interval', -1)
+]
+
+# Rows formatted per chunk yielded by iter_litchi_csv
+CSV_CHUNK_ROWS = 1000
+
+# Defaults keyed by input field; merging a waypoint over this dict fills in
+# missing fields, and _row_values then picks every column in a single call
+_DEFAULTS = dict(_FIELD_GETTERS)
+_row_values = operator.itemgetter(*_DEFAULTS)
+
+# JSON Schema for a well-formed waypoint with plain numeric values
+WAYPOINT_SCHEMA = {
+    "type": "object",
+    "required": ["latitude", "longitude", "altitude"],
+    "properties": {
+        "latitude": {"type": "number", "minimum": -90, "maximum": 90},
+        "longitude": {"type": "number", "minimum": -180, "maximum": 180},
+        "altitude": {"type": "number", "minimum": 0},
+        "heading": {"type": "number", "minimum": -180, "maximum": 360},
+        "gimbal_pitch_angle": {"type": "number", "minimum": -90, "maximum": 30}
+    }
+}
+
+# Compiled once at import into a straight-line validation function
+_validate_schema = fastjsonschema.compile(WAYPOINT_SCHEMA)
+
+# Missions at least this long are range-checked with NumPy in one pass
+VECTORIZE_MIN_WAYPOINTS = 64
+
+# Field, default when absent (None if required), minimum and maximum
+_RANGE_CHECKS = [
+    ('latitude', None, -90, 90),
+    ('longitude', None, -180, 180),
+    ('altitude', None, 0, np.inf),
+    ('heading', 0, -180, 360),
+    ('gimbal_pitch_angle', -90, -90, 30)
+]
+
 
 def validate_waypoint(waypoint):
     """
@@ -67,112 +145,172 @@ def validate_waypoint(waypoint):
     Returns:
         tuple: (is_valid, error_message)
     """
+    # Fast path: the compiled schema accepts the common all-numeric case.
+    # Anything it rejects goes through the checks below, which also accept
+    # numeric strings and produce the detailed error messages.
+    try:
+        _validate_schema(waypoint)
+        return True, ""
+    except fastjsonschema.JsonSchemaException:
+        pass
+    
     required_fields = ['latitude', 'longitude', 'altitude']
     
     for field in required_fields:
         if field not in waypoint:
             return False, f"Missing required field: {field}"
     
+    # Values decoded from JSON are normally int or float already, so
+    # float() is only called for anything else (e.g. numeric strings)
+    
     # Validate latitude range
     lat = waypoint.get('latitude')
-    try:
-        lat = float(lat)
-        if lat < -90 or lat > 90:
-            return False, f"Latitude must be between -90 and 90, got {lat}"
-    except (TypeError, ValueError):
-        return False, f"Latitude must be a number, got {lat}"
+    if type(lat) not in (int, float):
+        try:
+            lat = float(lat)
+        except (TypeError, ValueError):
+            return False, f"Latitude must be a number, got {lat}"
+    if not -90 <= lat <= 90:
+        return False, f"Latitude must be between -90 and 90, got {float(lat)}"
     
     # Validate longitude range
     lon = waypoint.get('longitude')
-    try:
-        lon = float(lon)
-        if lon < -180 or lon > 180:
-            return False, f"Longitude must be between -180 and 180, got {lon}"
-    except (TypeError, ValueError):
-        return False, f"Longitude must be a number, got {lon}"
+    if type(lon) not in (int, float):
+        try:
+            lon = float(lon)
+        except (TypeError, ValueError):
+            return False, f"Longitude must be a number, got {lon}"
+    if not -180 <= lon <= 180:
+        return False, f"Longitude must be between -180 and 180, got {float(lon)}"
     
     # Validate altitude
     alt = waypoint.get('altitude')
-    try:
-        alt = float(alt)
-        if alt < 0:
-            return False, f"Altitude must be non-negative, got {alt}"
-    except (TypeError, ValueError):
-        return False, f"Altitude must be a number, got {alt}"
+    if type(alt) not in (int, float):
+        try:
+            alt = float(alt)
+        except (TypeError, ValueError):
+            return False, f"Altitude must be a number, got {alt}"
+    if not alt >= 0:
+        return False, f"Altitude must be non-negative, got {float(alt)}"
     
     # Validate heading if provided
     if 'heading' in waypoint:
         heading = waypoint.get('heading')
-        try:
-            heading = float(heading)
-            if heading < -180 or heading > 360:
-                return False, f"Heading must be between -180 and 360, got {heading}"
-        except (TypeError, ValueError):
-            return False, f"Heading must be a number, got {heading}"
+        if type(heading) not in (int, float):
+            try:
+                heading = float(heading)
+            except (TypeError, ValueError):
+                return False, f"Heading must be a number, got {heading}"
+        if not -180 <= heading <= 360:
+            return False, f"Heading must be between -180 and 360, got {float(heading)}"
     
     # Validate gimbal pitch angle if provided
     if 'gimbal_pitch_angle' in waypoint:
         gimbal = waypoint.get('gimbal_pitch_angle')
-        try:
-            gimbal = float(gimbal)
-            if gimbal < -90 or gimbal > 30:
-                return False, f"Gimbal pitch angle must be between -90 and 30, got {gimbal}"
-        except (TypeError, ValueError):
-            return False, f"Gimbal pitch angle must be a number, got {gimbal}"
+        if type(gimbal) not in (int, float):
+            try:
+                gimbal = float(gimbal)
+            except (TypeError, ValueError):
+                return False, f"Gimbal pitch angle must be a number, got {gimbal}"
+        if not -90 <= gimbal <= 30:
+            return False, f"Gimbal pitch angle must be between -90 and 30, got {float(gimbal)}"
     
     return True, ""
 
 
-def generate_litchi_csv(waypoints):
+def _all_in_range(waypoints):
     """
-    Generate a Litchi CSV file content from waypoint data
+    Check every waypoint's numeric fields at once with NumPy
     
     Args:
         waypoints (list): List of waypoint dictionaries
         
     Returns:
-        str: CSV content as string
+        bool: True if all waypoints are valid, False if any need the
+        per-waypoint checks (invalid, non-numeric or missing values)
     """
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=LITCHI_HEADERS)
+    count = len(waypoints)
     
-    # Write header
-    writer.writeheader()
+    try:
+        for field, default, low, high in _RANGE_CHECKS:
+            if default is None:
+                values = (waypoint[field] for waypoint in waypoints)
+            else:
+                values = (waypoint.get(field, default) for waypoint in waypoints)
+            column = np.fromiter(values, dtype=np.float64, count=count)
+            # NaN compares False both ways, so None (converted to NaN) fails here
+            if not ((column >= low) & (column <= high)).all():
+                return False
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return False
     
-    # Write waypoints
-    for waypoint in waypoints:
-        row = {}
-        
-        # Map input fields to Litchi CSV format
-        row['latitude'] = waypoint.get('latitude', 0)
-        row['longitude'] = waypoint.get('longitude', 0)
-        row['altitude(m)'] = waypoint.get('altitude', 50)
-        row['heading(deg)'] = waypoint.get('heading', 0)
-        row['curvesize(m)'] = waypoint.get('curve_size', 0)
-        row['rotationdir'] = waypoint.get('rotation_direction', 0)
-        row['gimbalmode'] = waypoint.get('gimbal_mode', 0)
-        row['gimbalpitchangle'] = waypoint.get('gimbal_pitch_angle', -90)
-        
-        # Action parameters (up to 15 actions)
-        for i in range(1, 16):
-            action_type_key = f'action_type_{i}'
-            action_param_key = f'action_param_{i}'
-            row[f'actiontype{i}'] = waypoint.get(action_type_key, -1)
-            row[f'actionparam{i}'] = waypoint.get(action_param_key, 0)
+    return True
+
+
+def validate_waypoints(waypoints):
+    """
+    Validate a list of waypoint dictionaries
+    
+    Args:
+        waypoints (list): List of waypoint data
         
-        # Optional parameters with defaults
-        row['altitudemode'] = waypoint.get('altitude_mode', 0)
-        row['speed(m/s)'] = waypoint.get('speed', 0)
-        row['poi_latitude'] = waypoint.get('poi_latitude', 0)
-        row['poi_longitude'] = waypoint.get('poi_longitude', 0)
-        row['poi_altitude(m)'] = waypoint.get('poi_altitude', 0)
-        row['poi_altitudemode'] = waypoint.get('poi_altitude_mode', 0)
-        row['photo_timeinterval'] = waypoint.get('photo_time_interval', -1)
-        row['photo_distinterval'] = waypoint.get('photo_dist_interval', -1)
+    Returns:
+        tuple: (is_valid, error_message), the message naming the index of
+        the first invalid waypoint
+    """
+    if len(waypoints) >= VECTORIZE_MIN_WAYPOINTS and _all_in_range(waypoints):
+        return True, ""
+    
+    for idx, waypoint in enumerate(waypoints):
+        is_valid, error_msg = validate_waypoint(waypoint)
+        if not is_valid:
+            return False, f"Waypoint {idx}: {error_msg}"
+    
+    return True, ""
+
+
+class _RowEcho:
+    """File-like object whose write() returns the formatted row to the caller"""
+    
+    def write(self, value):
+        return value
+
+
+def iter_litchi_csv(waypoints):
+    """
+    Generate Litchi CSV content from waypoint data in chunks
+    
+    Args:
+        waypoints (iterable): Waypoint dictionaries
         
-        writer.writerow(row)
+    Yields:
+        bytes: UTF-8 encoded CSV rows in chunks of CSV_CHUNK_ROWS, the
+        first one starting with the header line
+    """
+    # Formatting is left to the csv module on purpose: cells must match
+    # Python's shortest float repr and pass through non-numeric values
+    # (quoted strings, null as empty), which a compiled numeric kernel
+    # such as Numba cannot reproduce.
+    writerow = csv.writer(_RowEcho()).writerow
+    rows = (_row_values({**_DEFAULTS, **waypoint}) for waypoint in waypoints)
     
-    csv_content = output.getvalue()
-    output.close()
+    # The precomputed header is prepended to the first chunk rather than
+    # written separately
+    chunk = "".join(map(writerow, islice(rows, CSV_CHUNK_ROWS))).encode('utf-8')
+    chunk = _HEADER_LINE_BYTES + chunk
+    while chunk:
+        yield chunk
+        chunk = "".join(map(writerow, islice(rows, CSV_CHUNK_ROWS))).encode('utf-8')
+
+
+def generate_litchi_csv(waypoints):
+    """
+    Generate a Litchi CSV file content from waypoint data
     
-    return csv_content
+    Args:
+        waypoints (list): List of waypoint dictionaries
+        
+    Returns:
+        bytes: UTF-8 encoded CSV content
+    """
+    return b"".join(iter_litchi_csv(waypoints))